@@ -1,9 +1,43 @@
+import atexit
+import datetime
+import functools
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import weakref
 import arcpy
 import arcgis
 from arcgis.features import FeatureLayer
+import numpy as np
 import pandas as pd
 from typing import Optional, Dict, List, Tuple
 
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow es opcional
+    pa = None
+
+# Alias de arcpy usados en cada paso de navegación
+SearchCursor = arcpy.da.SearchCursor
+FeatureClassToNumPyArray = arcpy.da.FeatureClassToNumPyArray
+AddFieldDelimiters = arcpy.AddFieldDelimiters
+Extent = arcpy.Extent
+
+# Navegadores vivos; la referencia débil no los retiene en memoria
+_live_navigators = weakref.WeakSet()
+
+
+def _flush_all_status() -> None:
+    """Escribe los mensajes pendientes de todos los navegadores al salir"""
+    for navigator in list(_live_navigators):
+        navigator._flush_status()
+
+
+atexit.register(_flush_all_status)
+
 class FeatureNavigator:
     """Navegador eficiente de features en ArcGIS Pro"""
     
@@ -16,10 +50,23 @@ class FeatureNavigator:
         """
         self.aprx = arcpy.mp.ArcGISProject("CURRENT")
         self.map = self.aprx.activeMap
-        self.features = []
+        # Capas del mapa enumeradas una sola vez
+        self._layers = list(self.map.listLayers())
+        self._feature_layers = [l for l in self._layers if l.isFeatureLayer]
+        self._layers_by_name = {}
+        for layer in self._feature_layers:
+            # Con nombres repetidos se conserva la primera capa
+            self._layers_by_name.setdefault(layer.name, layer)
         self.current_index = 0
         self.current_layer = None
-        self.oid_map = {}  # Mapeo rápido OID -> índice
+        # Almacenamiento columnar (SoA): un arreglo por campo
+        self._clear_features()
+        # Mensajes de navegación pendientes de escribir
+        self._status_buffer = []
+        self._status_lock = threading.Lock()
+        self._status_timer = None
+        # No perder mensajes pendientes al terminar el intérprete
+        _live_navigators.add(self)
         
         self._initialize_layer(layer_name)
     
@@ -27,25 +74,19 @@ class FeatureNavigator:
         """Inicializa la capa y carga los features"""
         try:
             if layer_name:
-                layers = [l for l in self.map.listLayers() if l.name == layer_name]
-                if not layers:
+                target_layer = self._layers_by_name.get(layer_name)
+                if not target_layer:
                     raise ValueError(f"Capa '{layer_name}' no encontrada")
-                target_layer = layers[0]
             else:
                 # Obtener primera capa de features visible
-                target_layer = None
-                for layer in self.map.listLayers():
-                    if layer.isFeatureLayer:
-                        target_layer = layer
-                        break
-                
-                if not target_layer:
+                if not self._feature_layers:
                     raise ValueError("No hay capas de features en el mapa")
+                target_layer = self._feature_layers[0]
             
             self.current_layer = target_layer
             self._load_features()
             print(f"✓ Capa '{self.current_layer.name}' inicializada")
-            print(f"✓ {len(self.features)} registros cargados\n")
+            print(f"✓ {len(self.oids)} registros cargados\n")
             
         except Exception as e:
             print(f"✗ Error al inicializar: {e}")
@@ -54,44 +95,197 @@ class FeatureNavigator:
     def _load_features(self) -> None:
         """Carga features de forma eficiente"""
         try:
-            self.features = []
-            self.oid_map = {}
+            self._clear_features()
             
             # Obtener el data source de la capa
             datasource = self.current_layer.dataSource
             
-            # Usar cursor de búsqueda para acceder a los features
-            fields = ['OID@', 'SHAPE@']
+            desc = arcpy.Describe(datasource)
+            self._datasource = datasource
+            self._oid_field = desc.OIDFieldName
+            self._is_point = desc.shapeType == 'Point'
             
-            with arcpy.da.SearchCursor(datasource, fields) as cursor:
-                for i, row in enumerate(cursor):
-                    oid = row[0]
-                    geometry = row[1]
-                    
-                    if oid is not None:
-                        self.features.append({
-                            'oid': oid,
-                            'geometry': geometry,
-                            'attributes': {'OID': oid}
-                        })
-                        self.oid_map[oid] = i
-            
-            if not self.features:
+            # Solo se cargan los OIDs; la geometría se consulta al hacer pan.
+            # Si la fuente no cambió desde la última carga se usa la caché en disco
+            source_mtime = self._source_mtime(datasource, desc)
+            self._arr = self._read_oid_cache(datasource, source_mtime)
+            if self._arr is None:
+                self._arr = FeatureClassToNumPyArray(datasource, ['OID@'], skip_nulls=True)
+                # La fecha se toma después de leer: la lectura puede tocar la fuente
+                self._write_oid_cache(datasource, self._source_mtime(datasource, desc))
+            if not len(self._arr):
                 raise ValueError("No se encontraron features con OID")
-                
+            
+            self.oids = self._arr['OID@'].astype(np.int64, copy=False)
+            self._set_count(len(self.oids))
+            self.attrs = pd.DataFrame({'OID': self.oids})
+            self._build_oid_lookup()
             self.current_index = 0
             
         except Exception as e:
             print(f"✗ Error al cargar features: {e}")
-            self.features = []
+            self._clear_features()
+    
+    @staticmethod
+    def _cache_path(datasource: str) -> str:
+        """Ruta del archivo de caché de OIDs para una fuente de datos"""
+        key = hashlib.sha1(datasource.encode('utf-8')).hexdigest()
+        return os.path.join(tempfile.gettempdir(), 'nav_cache', f"{key}.feather")
+    
+    @staticmethod
+    def _source_mtime(datasource: str, desc) -> Optional[float]:
+        """Fecha de última modificación de la fuente, o None si no se conoce"""
+        parts = datasource.replace('\\', '/').split('/')
+        if any(part.lower().endswith('.sde') for part in parts):
+            # Geodatabase enterprise: nunca se guarda en caché
+            return None
+        
+        modified = getattr(desc, 'dateModified', None)
+        if hasattr(modified, 'timestamp'):
+            return modified.timestamp()
+        
+        # Fuentes en disco (file GDB, shapefile): el archivo más reciente de la carpeta
+        path = datasource
+        while not os.path.exists(path):
+            parent = os.path.dirname(path)
+            if not parent or parent == path:
+                return None
+            path = parent
+        
+        # Los *.lock se crean o actualizan con solo abrir la fuente; no son ediciones
+        folder = path if os.path.isdir(path) else os.path.dirname(path)
+        try:
+            with os.scandir(folder) as entries:
+                return max((e.stat().st_mtime for e in entries if not e.name.endswith('.lock')),
+                           default=os.path.getmtime(folder))
+        except OSError:
+            # Sin permisos o archivos que desaparecen: se carga sin caché
+            return None
+    
+    def _read_oid_cache(self, datasource: str, source_mtime: Optional[float]) -> Optional[np.ndarray]:
+        """Lee los OIDs de la caché si sigue vigente para la fuente"""
+        if pa is None or source_mtime is None:
+            return None
+        
+        path = self._cache_path(datasource)
+        if not os.path.exists(path):
+            return None
+        try:
+            table = feather.read_table(path)
+            metadata = table.schema.metadata or {}
+            if metadata.get(b'source_mtime') != repr(source_mtime).encode('utf-8'):
+                return None
+            # Marca la caché como usada para que la poda conserve las recientes
+            os.utime(path)
+            return table.to_pandas().to_records(index=False)
+        except Exception:
+            return None
+    
+    def _write_oid_cache(self, datasource: str, source_mtime: Optional[float]) -> None:
+        """Guarda los OIDs cargados en la caché en disco"""
+        if pa is None or source_mtime is None:
+            return
+        
+        path = self._cache_path(datasource)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            table = pa.table({'OID@': self._arr['OID@']})
+            table = table.replace_schema_metadata({'source_mtime': repr(source_mtime)})
+            feather.write_feather(table, path)
+            self._prune_oid_cache(os.path.dirname(path))
+        except Exception as e:
+            # La caché es opcional; un fallo solo implica releer la próxima vez
+            print(f"✗ No se pudo guardar la caché: {e}")
     
-    def pan_to_feature(self, feature: Dict) -> None:
-        """Pan a un feature específico"""
+    @staticmethod
+    def _prune_oid_cache(folder: str, keep: int = 32) -> None:
+        """Conserva solo los archivos de caché usados más recientemente"""
+        with os.scandir(folder) as entries:
+            files = [e for e in entries if e.name.endswith('.feather')]
+        files.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for entry in files[keep:]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+    
+    def _clear_features(self) -> None:
+        """Vacía los arreglos de features"""
+        self._arr = None
+        self._datasource = None
+        self._oid_field = None
+        self._is_point = False
+        # Extents consultados bajo demanda, acotados a los más recientes
+        self._fetch_extent = functools.lru_cache(maxsize=256)(self._query_extent)
+        self.oids = np.empty(0, dtype=np.int64)
+        self._set_count(0)
+        self.attrs = pd.DataFrame()
+        # Búsqueda OID -> índice: base si los OIDs son consecutivos,
+        # si no, OIDs ordenados con su posición original
+        self._oid_base = None
+        self._sorted_oids = np.empty(0, dtype=np.int64)
+        self._oid_to_idx = np.empty(0, dtype=np.intp)
+        self._attr_indexes = {}  # Índices por campo: valor -> índices
+    
+    def _set_count(self, n: int) -> None:
+        """Guarda el total de registros y la máscara para navegar en ciclo"""
+        self._n = n
+        # Con n potencia de dos, (i % n) equivale a (i & (n - 1))
+        self._mask = n - 1 if n and (n & (n - 1)) == 0 else None
+    
+    def _build_oid_lookup(self) -> None:
+        """Prepara la búsqueda de índices por OID"""
+        oids = self.oids
+        if len(oids) and (len(oids) == 1 or (np.diff(oids) == 1).all()):
+            # Caso habitual: OIDs consecutivos, el índice es OID - base
+            self._oid_base = int(oids[0])
+            return
+        self._oid_to_idx = np.argsort(oids, kind='stable')
+        self._sorted_oids = oids[self._oid_to_idx]
+    
+    def _oid_index(self, oid: int) -> Optional[int]:
+        """Obtiene el índice de un OID, o None si no existe"""
+        if not isinstance(oid, (int, np.integer)):
+            # Valores no enteros (2.5, '5') nunca son un OID válido
+            return None
+        n = self._n
+        if self._oid_base is not None:
+            index = int(oid) - self._oid_base
+            return index if 0 <= index < n else None
+        
+        pos = int(np.searchsorted(self._sorted_oids, oid))
+        if pos < n and self._sorted_oids[pos] == oid:
+            return int(self._oid_to_idx[pos])
+        return None
+    
+    def _get_extent(self, index: int) -> Optional[Tuple[float, float, float, float]]:
+        """Obtiene el extent (xmin, ymin, xmax, ymax) del feature en el índice"""
+        extent = self._fetch_extent(int(self.oids[index]))
+        if extent is None:
+            return None
+        return (extent.XMin, extent.YMin, extent.XMax, extent.YMax)
+    
+    def _query_extent(self, oid: int) -> Optional['Extent']:
+        """Lee el extent de un único feature usando el índice del OID"""
+        oid_field = AddFieldDelimiters(self._datasource, self._oid_field)
+        where = f"{oid_field} = {oid}"
+        fields = ['SHAPE@XY' if self._is_point else 'SHAPE@']
+        with SearchCursor(self._datasource, fields, where_clause=where) as cursor:
+            for (shape,) in cursor:
+                if shape is None:
+                    continue
+                if self._is_point:
+                    return Extent(shape[0], shape[1], shape[0], shape[1])
+                # Se conserva solo el extent; la geometría se descarta
+                return shape.extent
+        return None
+    
+    def pan_to_feature(self, index: int) -> None:
+        """Pan al feature en el índice indicado"""
         try:
-            if feature['geometry']:
-                # Obtener extent de la geometría
-                extent = feature['geometry'].extent
-                
+            # El objeto Extent se construye una vez por OID y queda en caché
+            extent = self._fetch_extent(int(self.oids[index]))
+            if extent is not None:
                 # Aplicar zoom con padding
                 view = self.aprx.activeView
                 if hasattr(view, 'camera'):
@@ -102,146 +296,223 @@ class FeatureNavigator:
                     view.extent = extent
             
         except Exception as e:
-            print(f"✗ Error al hacer pan: {e}")
+            self._status(f"✗ Error al hacer pan: {e}")
+    
+    def _status(self, msg: str) -> None:
+        """Encola un mensaje; se escriben juntos tras una breve pausa"""
+        with self._status_lock:
+            self._status_buffer.append(msg)
+            if self._status_timer is not None:
+                self._status_timer.cancel()
+            self._status_timer = threading.Timer(0.1, self._flush_status)
+            self._status_timer.start()
+    
+    def _flush_status(self) -> None:
+        """
+        Escribe los mensajes pendientes en una sola operación
+        
+        Los comandos que imprimen directamente la llaman antes para
+        conservar el orden de la salida en la consola.
+        """
+        with self._status_lock:
+            buffer, self._status_buffer = self._status_buffer, []
+            if self._status_timer is not None:
+                self._status_timer.cancel()
+            self._status_timer = None
+        if buffer:
+            sys.stdout.write(''.join(f"{msg}\n" for msg in buffer))
+            sys.stdout.flush()
     
     def _print_info(self) -> None:
         """Muestra información del registro actual"""
-        if not self.features:
-            print("✗ No hay registros cargados\n")
+        if not self._n:
+            self._status("✗ No hay registros cargados\n")
             return
         
-        feature = self.features[self.current_index]
-        total = len(self.features)
-        oid = feature['oid']
+        total = self._n
+        oid = self.oids[self.current_index]
         
-        print(f"{'─' * 50}")
-        print(f"Registro: {self.current_index + 1}/{total}")
-        print(f"OID: {oid}")
-        print(f"{'─' * 50}\n")
+        sep = '─' * 50
+        self._status(f"{sep}\nRegistro: {self.current_index + 1}/{total}\nOID: {oid}\n{sep}\n")
     
     def next_feature(self) -> bool:
         """Ir al siguiente feature"""
-        if not self.features:
-            print("✗ No hay registros cargados\n")
+        if not self._n:
+            self._status("✗ No hay registros cargados\n")
             return False
         
-        self.current_index = (self.current_index + 1) % len(self.features)
-        feature = self.features[self.current_index]
-        self.pan_to_feature(feature)
+        if self._mask is not None:
+            self.current_index = (self.current_index + 1) & self._mask
+        else:
+            self.current_index = (self.current_index + 1) % self._n
+        self.pan_to_feature(self.current_index)
         self._print_info()
         return True
     
     def previous_feature(self) -> bool:
         """Ir al feature anterior"""
-        if not self.features:
-            print("✗ No hay registros cargados\n")
+        if not self._n:
+            self._status("✗ No hay registros cargados\n")
             return False
         
-        self.current_index = (self.current_index - 1) % len(self.features)
-        feature = self.features[self.current_index]
-        self.pan_to_feature(feature)
+        if self._mask is not None:
+            self.current_index = (self.current_index - 1) & self._mask
+        else:
+            self.current_index = (self.current_index - 1) % self._n
+        self.pan_to_feature(self.current_index)
         self._print_info()
         return True
     
     def go_to_oid(self, oid: int) -> bool:
         """Va a un OID específico"""
-        if oid not in self.oid_map:
-            print(f"✗ OID {oid} no encontrado\n")
+        index = self._oid_index(oid)
+        if index is None:
+            self._status(f"✗ OID {oid} no encontrado\n")
             return False
         
-        self.current_index = self.oid_map[oid]
-        feature = self.features[self.current_index]
-        self.pan_to_feature(feature)
+        self.current_index = index
+        self.pan_to_feature(self.current_index)
         self._print_info()
         return True
     
     def go_to_index(self, index: int) -> bool:
         """Va a un índice específico"""
-        if index < 0 or index >= len(self.features):
-            print(f"✗ Índice {index} fuera de rango (0-{len(self.features)-1})\n")
+        if index < 0 or index >= self._n:
+            self._status(f"✗ Índice {index} fuera de rango (0-{self._n-1})\n")
             return False
         
         self.current_index = index
-        feature = self.features[self.current_index]
-        self.pan_to_feature(feature)
+        self.pan_to_feature(self.current_index)
         self._print_info()
         return True
     
     def get_current_info(self) -> Optional[Dict]:
         """Obtiene información del registro actual"""
-        if not self.features:
+        if not self._n:
             return None
-        return self.features[self.current_index]
+        
+        return {
+            'oid': int(self.oids[self.current_index]),
+            'extent': self._get_extent(self.current_index),
+            'attributes': self.attrs.iloc[self.current_index].to_dict()
+        }
     
     def list_oids(self, limit: int = 50) -> None:
         """Lista OIDs disponibles"""
-        if not self.features:
+        self._flush_status()
+        if not self._n:
             print("✗ No hay registros\n")
             return
         
         print(f"{'─' * 50}")
-        print(f"OIDs disponibles (mostrando {min(limit, len(self.features))}/{len(self.features)})")
+        print(f"OIDs disponibles (mostrando {min(limit, self._n)}/{self._n})")
         print(f"{'─' * 50}")
         
-        for i in range(min(limit, len(self.features))):
-            oid = self.features[i]['oid']
+        for i in range(min(limit, self._n)):
+            oid = self.oids[i]
             marker = " ← ACTUAL" if i == self.current_index else ""
             print(f"Índice {i:4d}: OID {oid}{marker}")
         
-        if len(self.features) > limit:
-            print(f"\n... y {len(self.features) - limit} más")
+        if self._n > limit:
+            print(f"\n... y {self._n - limit} más")
         
         print(f"\nUsa: nav.go_to_oid(numero) o nav.go_to_index(numero)\n")
     
     def filter_by_attribute(self, field: str, value) -> List[int]:
         """Filtra features por atributo y retorna índices"""
-        matches = []
-        for i, feature in enumerate(self.features):
-            if feature['attributes'].get(field) == value:
-                matches.append(i)
+        self._flush_status()
+        if field in self.attrs.columns:
+            # El índice del campo se construye una vez y se reutiliza
+            index = self._attr_indexes.get(field)
+            if index is None:
+                index = self.attrs.groupby(field, sort=False).indices
+                self._attr_indexes[field] = index
+            matches = index[value].tolist() if value in index else []
+        else:
+            matches = []
         
         print(f"✓ {len(matches)} registros encontrados con {field}={value}\n")
         return matches
     
     def jump_to_filtered(self, field: str, value) -> bool:
         """Va al primer feature que cumple el filtro"""
-        matches = self.filter_by_attribute(field, value)
-        if matches:
-            return self.go_to_index(matches[0])
-        return False
+        if not self._n:
+            self._status("✗ No hay registros cargados\n")
+            return False
+        
+        if field in self.attrs.columns:
+            # Campos cargados en memoria: se usa el mismo índice que filter_by_attribute
+            matches = self.filter_by_attribute(field, value)
+            if matches:
+                return self.go_to_index(matches[0])
+            return False
+        
+        try:
+            oid = self._cursor_filter(field, value)
+        except Exception as e:
+            self._status(f"✗ Error al filtrar: {e}\n")
+            return False
+        
+        if oid is None:
+            self._status(f"✗ Ningún registro con {field}={value}\n")
+            return False
+        return self.go_to_oid(oid)
+    
+    def _cursor_filter(self, field: str, value) -> Optional[int]:
+        """Obtiene el OID del primer feature con field=value consultando la fuente"""
+        if field == 'OID':
+            # 'OID' es el nombre que usa el navegador para el campo de OID de la fuente
+            field = self._oid_field
+        field_name = AddFieldDelimiters(self._datasource, field)
+        if value is None:
+            where = f"{field_name} IS NULL"
+        else:
+            where = f"{field_name} = {self._sql_literal(value)}"
+        with SearchCursor(self._datasource, ['OID@'], where_clause=where) as cursor:
+            return next(cursor, (None,))[0]
+    
+    @staticmethod
+    def _sql_literal(value) -> str:
+        """Convierte un valor de Python en un literal SQL"""
+        if isinstance(value, str):
+            return "'" + value.replace("'", "''") + "'"
+        if isinstance(value, bool):
+            return str(int(value))
+        if isinstance(value, datetime.datetime):
+            return f"TIMESTAMP '{value:%Y-%m-%d %H:%M:%S}'"
+        if isinstance(value, datetime.date):
+            return f"DATE '{value:%Y-%m-%d}'"
+        return str(value)
     
     def export_to_dataframe(self) -> 'pd.DataFrame':
         """Exporta todos los features a un DataFrame"""
-        if not self.features:
+        self._flush_status()
+        if not self._n:
             print("✗ No hay registros\n")
             return pd.DataFrame()
         
-        data = []
-        for feature in self.features:
-            row = feature['attributes'].copy()
-            row['Índice'] = len(data)
-            data.append(row)
-        
-        df = pd.DataFrame(data)
+        df = self.attrs.assign(Índice=np.arange(self._n))
         print(f"✓ {len(df)} registros exportados a DataFrame\n")
         return df
     
     def get_statistics(self) -> None:
         """Muestra estadísticas de los features"""
-        if not self.features:
+        self._flush_status()
+        if not self._n:
             print("✗ No hay registros\n")
             return
         
         print(f"{'═' * 50}")
         print(f"ESTADÍSTICAS - Capa: {self.current_layer.name}")
         print(f"{'═' * 50}")
-        print(f"Total de registros: {len(self.features)}")
+        print(f"Total de registros: {self._n}")
         print(f"Registro actual: {self.current_index + 1}")
-        print(f"OID actual: {self.features[self.current_index]['oid']}")
+        print(f"OID actual: {self.oids[self.current_index]}")
         print(f"{'═' * 50}\n")
     
     def help(self) -> None:
         """Muestra la ayuda de comandos"""
+        self._flush_status()
         print(f"\n{'═' * 60}")
         print("NAVEGADOR DE FEATURES - GUÍA DE COMANDOS")
         print(f"{'═' * 60}")
@@ -1,7 +1,27 @@
+import atexit
+import sys
+import time
+import weakref
 import arcpy
 import pythonaddins
 from threading import Timer
 
+# Alias de arcpy usados en cada paso de navegación
+SearchCursor = arcpy.da.SearchCursor
+FeatureClassToNumPyArray = arcpy.da.FeatureClassToNumPyArray
+Extent = arcpy.Extent
+RefreshActiveView = arcpy.RefreshActiveView
+
+# Herramientas vivas; la referencia débil no las retiene en memoria
+_live_tools = weakref.WeakSet()
+
+def _flush_all_messages():
+    """Escribe los mensajes pendientes de todas las herramientas al salir"""
+    for tool in list(_live_tools):
+        tool.flush_messages()
+
+atexit.register(_flush_all_messages)
+
 class NavigationTool(object):
     """Herramienta de navegación entre registros de feature class"""
     
@@ -11,6 +31,14 @@ class NavigationTool(object):
         self.current_index = 0
         self.feature_records = []
         self.layer_name = None
+        # Mensajes pendientes de escribir en la consola
+        self._status_buffer = []
+        self._last_flush = 0.0
+        # No perder mensajes pendientes al terminar el intérprete
+        _live_tools.add(self)
+        # Control del refresco de la vista durante ráfagas de teclas
+        self._last_refresh = 0.0
+        self._refresh_pending = False
         self.mxd = arcpy.mapping.MapDocument("CURRENT")
         self.df = arcpy.mapping.ListDataFrames(self.mxd)[0]
         self.initialize_data()
@@ -51,15 +79,34 @@ class NavigationTool(object):
         try:
             self.feature_records = []
             
-            # Crear cursor para leer geometrías y OIDs
-            fields = ["OID@", "SHAPE@"]
+            # Leer OIDs y solo el extent (4 floats) de cada geometría
+            is_point = arcpy.Describe(feature_class_path).shapeType == "Point"
             
-            with arcpy.da.SearchCursor(feature_class_path, fields) as cursor:
-                for row in cursor:
-                    self.feature_records.append({
-                        'oid': row[0],
-                        'shape': row[1]
-                    })
+            if is_point:
+                # Lectura masiva en código nativo para capas de puntos; las
+                # geometrías nulas se conservan (como NaN) igual que en el cursor
+                nan = float("nan")
+                arr = FeatureClassToNumPyArray(
+                    feature_class_path, ["OID@", "SHAPE@X", "SHAPE@Y"],
+                    null_value={"SHAPE@X": nan, "SHAPE@Y": nan})
+                self.feature_records = [
+                    {'oid': oid, 'extent': None if x != x else (x, y, x, y)}
+                    for oid, x, y in arr.tolist()
+                ]
+            else:
+                with SearchCursor(feature_class_path, ["OID@", "SHAPE@"]) as cursor:
+                    for row in cursor:
+                        shape = row[1]
+                        if shape is None:
+                            bbox = None
+                        else:
+                            ext = shape.extent
+                            bbox = (ext.XMin, ext.YMin, ext.XMax, ext.YMax)
+                        
+                        self.feature_records.append({
+                            'oid': row[0],
+                            'extent': bbox
+                        })
             
             if self.feature_records:
                 self.current_index = 0
@@ -71,18 +118,20 @@ class NavigationTool(object):
         except Exception as e:
             pythonaddins.MessageBox("Error al cargar features: " + str(e), "Error", 0)
     
-    def pan_to_feature(self, feature_shape):
+    def get_extent(self, record):
+        """Obtiene el objeto Extent del registro, construido una sola vez"""
+        extent = record.get('extent_obj')
+        if extent is None and record['extent']:
+            extent = record['extent_obj'] = Extent(*record['extent'])
+        return extent
+    
+    def pan_to_feature(self, extent):
         """Hace pan a la feature especificada"""
         try:
-            if feature_shape:
-                # Obtener el extent de la geometría
-                extent = feature_shape.extent
-                
-                # Hacer pan al centro de la feature
-                self.df.extent = extent
-                
-                # Refrescar la vista
-                arcpy.RefreshActiveView()
+            if extent is not None:
+                # Hacer pan al centro de la feature y refrescar la vista
+                # (a lo sumo un redibujado cada 50 ms durante una ráfaga)
+                self.schedule_refresh(extent)
                 
                 # Mostrar información del registro actual
                 current_record = self.feature_records[self.current_index]
@@ -98,14 +147,44 @@ class NavigationTool(object):
         except Exception as e:
             pythonaddins.MessageBox("Error al hacer pan: " + str(e), "Error", 0)
     
+    def schedule_refresh(self, extent):
+        """Aplica el extent y refresca la vista como máximo cada 50 ms"""
+        # Todo ocurre en el hilo de ArcMap: arcpy.mapping y los mensajes
+        # de pythonaddins no son seguros desde otros hilos
+        self.df.extent = extent
+        if time.time() - self._last_refresh >= 0.05:
+            self.refresh_view()
+        else:
+            # El último extent se dibuja al soltar la tecla (onKeyUp)
+            self._refresh_pending = True
+    
+    def refresh_view(self):
+        """Redibuja la vista activa"""
+        RefreshActiveView()
+        self._last_refresh = time.time()
+        self._refresh_pending = False
+    
     def show_temporary_message(self, message):
         """Muestra un mensaje temporal en la barra de estado"""
         try:
             # Esto es una aproximación, ya que ArcMap no tiene una barra de estado fácil de acceder
-            print(message)  # Se mostrará en la consola de Python
+            # Durante una ráfaga de teclas se escribe a lo sumo cada 100 ms; lo
+            # pendiente se escribe al soltar la tecla (onKeyUp), siempre en el
+            # hilo de ArcMap porque la consola no es segura desde otros hilos
+            self._status_buffer.append(message)
+            if time.time() - self._last_flush >= 0.1:
+                self.flush_messages()
         except:
             pass
     
+    def flush_messages(self):
+        """Escribe en la consola de Python los mensajes pendientes"""
+        buffer, self._status_buffer = self._status_buffer, []
+        self._last_flush = time.time()
+        if buffer:
+            sys.stdout.write("\n".join(buffer) + "\n")
+            sys.stdout.flush()
+    
     def next_record(self):
         """Navega al siguiente registro"""
         if not self.feature_records:
@@ -118,7 +197,7 @@ class NavigationTool(object):
             self.current_index = 0  # Volver al principio
         
         current_feature = self.feature_records[self.current_index]
-        self.pan_to_feature(current_feature['shape'])
+        self.pan_to_feature(self.get_extent(current_feature))
     
     def previous_record(self):
         """Navega al registro anterior"""
@@ -132,7 +211,7 @@ class NavigationTool(object):
             self.current_index = len(self.feature_records) - 1  # Ir al final
         
         current_feature = self.feature_records[self.current_index]
-        self.pan_to_feature(current_feature['shape'])
+        self.pan_to_feature(self.get_extent(current_feature))
     
     def onKeyDown(self, event):
         """Maneja los eventos de teclado"""
@@ -149,6 +228,15 @@ class NavigationTool(object):
                 
         except Exception as e:
             pythonaddins.MessageBox("Error en manejo de teclas: " + str(e), "Error", 0)
+    
+    def onKeyUp(self, event):
+        """Al soltar la tecla se dibuja el último extent y se escriben los mensajes pendientes"""
+        try:
+            if self._refresh_pending:
+                self.refresh_view()
+            self.flush_messages()
+        except Exception as e:
+            pythonaddins.MessageBox("Error al refrescar la vista: " + str(e), "Error", 0)
 
 # Crear instancia global de la herramienta
 navigation_tool = NavigationTool()
@@ -158,6 +246,10 @@ def onKeyDown(event):
     """Función global para capturar eventos de teclado"""
     navigation_tool.onKeyDown(event)
 
+def onKeyUp(event):
+    """Función global para capturar la liberación de teclas"""
+    navigation_tool.onKeyUp(event)
+
 # Funciones auxiliares para usar desde la interfaz de ArcMap
 def next_feature():
     """Función para ir al siguiente registro"""
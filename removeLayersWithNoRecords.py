@@ -1,5 +1,9 @@
 import arcpy
 
+# Alias de arcpy usados dentro de los recorridos
+SearchCursor = arcpy.da.SearchCursor
+RemoveLayer = arcpy.mapping.RemoveLayer
+
 # Referencia al documento de mapa actual
 mxd = arcpy.mapping.MapDocument("CURRENT")
 df = arcpy.mapping.ListDataFrames(mxd)[0]  # Puedes ajustar si hay más de un DataFrame
@@ -7,18 +11,33 @@ df = arcpy.mapping.ListDataFrames(mxd)[0]  # Puedes ajustar si hay más de un Da
 # Lista de capas en el DataFrame
 layers = arcpy.mapping.ListLayers(mxd, "", df)
 
+# Primero se identifican las capas vacías y luego se remueven en bloque
+to_remove = []
+
 for lyr in layers:
     # Verifica si la capa es una capa de entidad y está visible
     if lyr.isFeatureLayer:
         try:
-            # Usa un cursor de búsqueda para contar registros
-            count = int(arcpy.GetCount_management(lyr).getOutput(0))
-            if count == 0:
-                arcpy.mapping.RemoveLayer(df, lyr)
-                arcpy.AddMessage("Capa removida: {}".format(lyr.name))
+            # Basta con leer un registro para saber si la capa está vacía
+            with SearchCursor(lyr, ["OID@"]) as cursor:
+                empty = next(cursor, None) is None
+            if empty:
+                to_remove.append(lyr)
         except Exception as e:
             arcpy.AddWarning("No se pudo procesar la capa '{}': {}".format(lyr.name, e))
 
+for lyr in to_remove:
+    try:
+        RemoveLayer(df, lyr)
+        arcpy.AddMessage("Capa removida: {}".format(lyr.name))
+    except Exception as e:
+        arcpy.AddWarning("No se pudo remover la capa '{}': {}".format(lyr.name, e))
+
+# Un único refresco de la tabla de contenidos y de la vista
+if to_remove:
+    arcpy.RefreshTOC()
+    arcpy.RefreshActiveView()
+
 # Guarda los cambios si es necesario
 # mxd.save()
 
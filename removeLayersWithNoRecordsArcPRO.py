@@ -1,20 +1,55 @@
 import arcpy
 
+# Alias de arcpy usados dentro del recorrido
+SearchCursor = arcpy.da.SearchCursor
+
 # Accede al proyecto y al mapa activo
 aprx = arcpy.mp.ArcGISProject("CURRENT")
 mapa = aprx.activeMap
 
-# Recorre las capas del mapa
-for capa in mapa.listLayers():
-    if capa.isFeatureLayer and capa.supports("DATASOURCE"):
-        try:
-            count = int(arcpy.management.GetCount(capa).getOutput(0))
-            if count == 0:
-                # Usa supports("NAME") antes de acceder a .name
-                nombre = capa.name if capa.supports("NAME") else "Capa sin nombre"
-                mapa.removeLayer(capa)
-                print("Capa removida:", nombre)
-        except Exception as e:
-            print("Error al procesar capa:", e)
+# Enumera las capas una sola vez; removeLayer no altera esta lista
+capas = list(mapa.listLayers())
+
+# Lee una sola vez las propiedades que usa el recorrido
+propiedades = [
+    (capa,
+     getattr(capa, "isFeatureLayer", False),
+     capa.supports("DATASOURCE") if hasattr(capa, "supports") else False)
+    for capa in capas
+]
+
+# Capas vacías ocultadas en esta ejecución
+capas_ocultas = []
+
+
+def prune_hidden():
+    """Remueve del mapa las capas vacías que se ocultaron"""
+    for capa in capas_ocultas:
+        nombre = capa.name if capa.supports("NAME") else "Capa sin nombre"
+        mapa.removeLayer(capa)
+        print("Capa removida:", nombre)
+    del capas_ocultas[:]
+
+
+# Recorre las capas del mapa; las capas vacías se ocultan en lugar de
+# removerse, así el documento no se modifica en cada iteración
+for capa, es_de_entidades, tiene_origen in propiedades:
+    if not (es_de_entidades and tiene_origen):
+        continue
+    try:
+        # Basta con leer un registro para saber si la capa está vacía
+        with SearchCursor(capa, ["OID@"]) as cursor:
+            vacia = next(cursor, None) is None
+        if vacia:
+            # Usa supports("NAME") antes de acceder a .name (solo en capas vacías)
+            nombre = capa.name if capa.supports("NAME") else "Capa sin nombre"
+            capa.visible = False
+            capas_ocultas.append(capa)
+            print("Capa ocultada:", nombre)
+    except Exception as e:
+        print("Error al procesar capa:", e)
+
+if capas_ocultas:
+    print("Usa prune_hidden() para remover las capas ocultadas")
 
 del aprx
@@ -1,3 +1,13 @@
+import os
+
+import arcpy
+
+# Bind the arcpy tools used for every layer and table once
+ValidateTableName = arcpy.ValidateTableName
+CopyFeatures = arcpy.management.CopyFeatures
+CopyRows = arcpy.management.CopyRows
+
+
 def selectAndSaveLayers(outputGdb):
     # Get the current project and active map
     aprx = arcpy.mp.ArcGISProject("CURRENT")
@@ -7,28 +17,34 @@ def selectAndSaveLayers(outputGdb):
         arcpy.AddError("No active map found.")
         return
 
+    # Exports run one after another: geoprocessing tools are not
+    # thread-safe within a single Pro session, and every write goes to
+    # the same output GDB anyway
+
     # Loop through all layers in the active map
     for layer in activeMap.listLayers():
         # Check if the layer is a feature layer
         if layer.isFeatureLayer:
             try:
                 # Define output feature class name
-                layerName = arcpy.ValidateTableName(layer.name, outputGdb)
+                layerName = ValidateTableName(layer.name, outputGdb)
                 outputFeatureClass = os.path.join(outputGdb, layerName)
-                arcpy.analysis.Select(layer,outputFeatureClass)
+
+                # Copying the layer (not its data source) keeps joins,
+                # field visibility and aliases, as Select did
+                CopyFeatures(layer, outputFeatureClass)
 
                 print(f"Saved: {outputFeatureClass}")
             except Exception as e:
                 print(f"Failed to process layer '{layer.name}': {e}")
     for table in activeMap.listTables():
         try:
-            # Select all rows
-            arcpy.management.SelectLayerByAttribute(table, "NEW_SELECTION", "1=1")
-
             # Create valid name for output
-            tableName = arcpy.ValidateTableName(table.name, outputGdb)
+            tableName = ValidateTableName(table.name, outputGdb)
             outputTable = os.path.join(outputGdb, tableName)
-            arcpy.analysis.TableSelect(table, outputTable)
+
+            # CopyRows already copies every row; no selection needed
+            CopyRows(table, outputTable)
             print(f"Table saved: {outputTable}")
         except Exception as e:
             print(f"Failed to process table '{table.name}': {e}")